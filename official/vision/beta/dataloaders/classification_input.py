@@ -29,6 +29,12 @@ STDDEV_RGB = (0.229 * 255, 0.224 * 255, 0.225 * 255)
 DEFAULT_IMAGE_FIELD_KEY = 'image/encoded'
 DEFAULT_LABEL_FIELD_KEY = 'image/class/label'
 
+_DTYPE_MAP = {
+    'float32': tf.float32,
+    'float16': tf.float16,
+    'bfloat16': tf.bfloat16,
+}
+
 
 class Decoder(decoder.Decoder):
   """A tf.Example decoder for classification task."""
@@ -100,14 +106,9 @@ class Parser(parser.Parser):
     self._aug_rand_hflip = aug_rand_hflip
     self._num_classes = num_classes
     self._image_field_key = image_field_key
-    if dtype == 'float32':
-      self._dtype = tf.float32
-    elif dtype == 'float16':
-      self._dtype = tf.float16
-    elif dtype == 'bfloat16':
-      self._dtype = tf.bfloat16
-    else:
+    if dtype not in _DTYPE_MAP:
       raise ValueError('dtype {!r} is not supported!'.format(dtype))
+    self._dtype = _DTYPE_MAP[dtype]
     if aug_type:
       if aug_type.type == 'autoaug':
         self._augmenter = augment.AutoAugment(
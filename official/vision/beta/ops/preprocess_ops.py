@@ -37,7 +37,6 @@ def clip_or_pad_to_fixed_size(input_tensor, size, constant_values=0):
     `Tensor` with the first dimension padded to `size`.
   """
   input_shape = input_tensor.get_shape().as_list()
-  padding_shape = []
 
   # Computes the padding length on the first dimension, clip input tensor if it
   # is longer than `size`.
@@ -46,16 +45,13 @@ def clip_or_pad_to_fixed_size(input_tensor, size, constant_values=0):
   input_tensor = input_tensor[:input_length]
 
   padding_length = tf.maximum(0, size - input_length)
-  padding_shape.append(padding_length)
-
-  # Copies shapes of the rest of input shape dimensions.
-  for i in range(1, len(input_shape)):
-    padding_shape.append(tf.shape(input_tensor)[i])
+  # Only the end of the first dimension is padded.
+  paddings = [[0, padding_length]] + [[0, 0]] * (len(input_shape) - 1)
 
   # Pads input tensor to the fixed first dimension.
-  paddings = tf.cast(constant_values * tf.ones(padding_shape),
-                     input_tensor.dtype)
-  padded_tensor = tf.concat([input_tensor, paddings], axis=0)
+  padded_tensor = tf.pad(
+      input_tensor, paddings,
+      constant_values=tf.cast(constant_values, input_tensor.dtype))
   output_shape = input_shape
   output_shape[0] = size
   padded_tensor.set_shape(output_shape)
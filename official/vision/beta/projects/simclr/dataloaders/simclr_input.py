@@ -46,6 +46,12 @@ from official.vision.beta.ops import preprocess_ops
 from official.vision.beta.projects.simclr.dataloaders import preprocess_ops as simclr_preprocess_ops
 from official.vision.beta.projects.simclr.modeling import simclr_model
 
+_DTYPE_MAP = {
+    'float32': tf.float32,
+    'float16': tf.float16,
+    'bfloat16': tf.bfloat16,
+}
+
 
 class Decoder(decoder.Decoder):
   """A tf.Example decoder for classification task."""
@@ -133,14 +139,9 @@ class Parser(parser.Parser):
     if max(self._output_size[0], self._output_size[1]) <= 32:
       self._test_crop = False
 
-    if dtype == 'float32':
-      self._dtype = tf.float32
-    elif dtype == 'float16':
-      self._dtype = tf.float16
-    elif dtype == 'bfloat16':
-      self._dtype = tf.bfloat16
-    else:
+    if dtype not in _DTYPE_MAP:
       raise ValueError('dtype {!r} is not supported!'.format(dtype))
+    self._dtype = _DTYPE_MAP[dtype]
 
   def _parse_one_train_image(self, image_bytes):
 
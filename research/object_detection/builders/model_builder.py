@@ -1162,6 +1162,10 @@ def _build_center_net_model(center_net_config, is_training, add_summaries):
       temporal_offset_params=temporal_offset_params,
       use_depthwise=center_net_config.use_depthwise,
       compute_heatmap_sparse=center_net_config.compute_heatmap_sparse,
+      truncate_heatmap_gaussian=(
+          center_net_config.truncate_heatmap_gaussian),
+      truncate_heatmap_max_radius=(
+          center_net_config.truncate_heatmap_max_radius or None),
       non_max_suppression_fn=non_max_suppression_fn)
 
 
@@ -850,6 +850,46 @@ def _compute_std_dev_from_box_size(boxes_height, boxes_width, min_overlap):
   return sigma
 
 
+def _get_output_size(height, width, stride):
+  """Computes the output image size for a given input size and stride.
+
+  Args:
+    height: int or int tensor, the height of the input image.
+    width: int or int tensor, the width of the input image.
+    stride: int, the stride of the output with respect to the input.
+
+  Returns:
+    A tuple (out_height, out_width) of the output image size, which is at least
+    1 in each dimension. Python ints are returned when the input size is
+    statically known, so that the output size is a graph construction time
+    constant.
+  """
+  if isinstance(height, int) and isinstance(width, int):
+    return max(height // stride, 1), max(width // stride, 1)
+  return tf.maximum(height // stride, 1), tf.maximum(width // stride, 1)
+
+
+def _stack_if_same_static_shape(tensor_list):
+  """Stacks the tensors if they all have the same fully defined static shape.
+
+  Args:
+    tensor_list: A list of tensors (or Nones) over the batch dimension.
+
+  Returns:
+    A tensor of shape [batch_size] + static_shape stacking the elements of
+    tensor_list, or None if the elements don't share the same fully defined
+    static shape.
+  """
+  if any(t is None for t in tensor_list):
+    return None
+  static_shape = tensor_list[0].shape
+  if not static_shape.is_fully_defined():
+    return None
+  if any(t.shape != static_shape for t in tensor_list[1:]):
+    return None
+  return tf.stack(tensor_list, axis=0)
+
+
 def _preprocess_keypoints_and_weights(out_height, out_width, keypoints,
                                       class_onehot, class_weights,
                                       keypoint_weights, class_id,
@@ -925,7 +965,10 @@ class CenterNetCenterHeatmapTargetAssigner(object):
                compute_heatmap_sparse=False,
                keypoint_class_id=None,
                keypoint_indices=None,
-               keypoint_weights_for_center=None):
+               keypoint_weights_for_center=None,
+               truncate_gaussian=False,
+               truncate_gaussian_max_radius=None,
+               vectorize_padded_batch=False):
     """Initializes the target assigner.
 
     Args:
@@ -947,6 +990,26 @@ class CenterNetCenterHeatmapTargetAssigner(object):
         the number of keypoints. The object center is calculated by the weighted
         mean of the keypoint locations. If not provided, the object center is
         determined by the center of the bounding box (default behavior).
+      truncate_gaussian: bool, indicating whether or not to truncate the
+        Gaussian kernel of each object at its radius (as in the original
+        CenterNet implementation) and only compute the heatmap within the
+        local footprint of each object. This avoids computing a full
+        resolution map per object. Note that it requires one-hot class labels.
+      truncate_gaussian_max_radius: An optional int, the static upper bound
+        (in output pixels) of the truncation radius. The local footprints then
+        have a static size, which is required to compile the truncated heatmap
+        with XLA (e.g. on TPU). Kernels wider than that are truncated at this
+        radius. If None, the footprint size depends on the groundtruth boxes
+        and the truncated heatmap can only be used without XLA (CPU/GPU).
+      vectorize_padded_batch: bool, indicating whether or not to compute the
+        box center heatmaps of all images with a single tf.vectorized_map when
+        the groundtruth of all images has the same static shape (e.g. padded
+        groundtruth on TPU). Note that the dense and sparse heatmap ops then
+        materialize their per-instance intermediates for the whole batch at
+        once, which increases peak memory (see b/170989061). It has no effect
+        when truncate_gaussian is True. It is meant to be used in graph mode
+        (e.g. within a tf.function), since each eager call traces a new
+        function.
     """
 
     self._stride = stride
@@ -955,6 +1018,9 @@ class CenterNetCenterHeatmapTargetAssigner(object):
     self._keypoint_class_id = keypoint_class_id
     self._keypoint_indices = keypoint_indices
     self._keypoint_weights_for_center = keypoint_weights_for_center
+    self._truncate_gaussian = truncate_gaussian
+    self._truncate_gaussian_max_radius = truncate_gaussian_max_radius
+    self._vectorize_padded_batch = vectorize_padded_batch
 
   def assign_center_targets_from_boxes(self,
                                        height,
@@ -989,24 +1055,19 @@ class CenterNetCenterHeatmapTargetAssigner(object):
         the stride specified during initialization.
     """
 
-    out_height = tf.cast(tf.maximum(height // self._stride, 1), tf.float32)
-    out_width = tf.cast(tf.maximum(width // self._stride, 1), tf.float32)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     # Compute the yx-grid to be used to generate the heatmap. Each returned
     # tensor has shape of [out_height, out_width]
     (y_grid, x_grid) = ta_utils.image_shape_to_grids(out_height, out_width)
 
-    heatmaps = []
-    if gt_weights_list is None:
-      gt_weights_list = [None] * len(gt_boxes_list)
-    # TODO(vighneshb) Replace the for loop with a batch version.
-    for boxes, class_targets, weights in zip(gt_boxes_list, gt_classes_list,
-                                             gt_weights_list):
+    def _center_heatmap_for_image(boxes, class_targets, weights=None):
+      """Computes the center heatmap of a single image."""
       boxes = box_list.BoxList(boxes)
       # Convert the box coordinates to absolute output image dimension space.
       boxes = box_list_ops.to_absolute_coordinates(
           boxes,
-          tf.maximum(height // self._stride, 1),
-          tf.maximum(width // self._stride, 1),
+          out_height,
+          out_width,
           maximum_normalized_coordinate=maximum_normalized_coordinate)
       # Get the box center coordinates. Each returned tensors have the shape of
       # [num_instances]
@@ -1018,7 +1079,7 @@ class CenterNetCenterHeatmapTargetAssigner(object):
                                              self._min_overlap)
       # Apply the Gaussian kernel to the center coordinates. Returned heatmap
       # has shape of [out_height, out_width, num_classes]
-      heatmap = ta_utils.coordinates_to_heatmap(
+      return ta_utils.coordinates_to_heatmap(
           y_grid=y_grid,
           x_grid=x_grid,
           y_coordinates=y_center,
@@ -1026,8 +1087,34 @@ class CenterNetCenterHeatmapTargetAssigner(object):
           sigma=sigma,
           channel_onehot=class_targets,
           channel_weights=weights,
-          sparse=self._compute_heatmap_sparse)
-      heatmaps.append(heatmap)
+          sparse=self._compute_heatmap_sparse,
+          truncate_gaussian=self._truncate_gaussian,
+          max_radius=self._truncate_gaussian_max_radius)
+
+    if gt_weights_list is None:
+      gt_weights_list = [None] * len(gt_boxes_list)
+
+    # When enabled and the groundtruth is padded to a fixed number of boxes
+    # (e.g. on TPU), all images are vectorized into a single batched
+    # computation instead of building a separate subgraph per image. The
+    # truncated heatmap has a per-image footprint size and can't be vectorized
+    # with tf.vectorized_map.
+    if self._vectorize_padded_batch and not self._truncate_gaussian:
+      batch_boxes = _stack_if_same_static_shape(gt_boxes_list)
+      batch_classes = _stack_if_same_static_shape(gt_classes_list)
+      if all(weights is None for weights in gt_weights_list):
+        batch_elems = (batch_boxes, batch_classes)
+      else:
+        batch_elems = (batch_boxes, batch_classes,
+                       _stack_if_same_static_shape(gt_weights_list))
+      if all(elem is not None for elem in batch_elems):
+        return tf.vectorized_map(
+            lambda elems: _center_heatmap_for_image(*elems), batch_elems)
+
+    heatmaps = []
+    for boxes, class_targets, weights in zip(gt_boxes_list, gt_classes_list,
+                                             gt_weights_list):
+      heatmaps.append(_center_heatmap_for_image(boxes, class_targets, weights))
 
     # Return the stacked heatmaps over the batch.
     return tf.stack(heatmaps, axis=0)
@@ -1068,8 +1155,7 @@ class CenterNetCenterHeatmapTargetAssigner(object):
     assert (self._keypoint_weights_for_center is not None and
             self._keypoint_class_id is not None and
             self._keypoint_indices is not None)
-    out_height = tf.cast(tf.maximum(height // self._stride, 1), tf.float32)
-    out_width = tf.cast(tf.maximum(width // self._stride, 1), tf.float32)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     # Compute the yx-grid to be used to generate the heatmap. Each returned
     # tensor has shape of [out_height, out_width]
     (y_grid, x_grid) = ta_utils.image_shape_to_grids(out_height, out_width)
@@ -1165,7 +1251,9 @@ class CenterNetCenterHeatmapTargetAssigner(object):
           sigma=sigma,
           channel_onehot=classes,
           channel_weights=updated_class_weights,
-          sparse=self._compute_heatmap_sparse)
+          sparse=self._compute_heatmap_sparse,
+          truncate_gaussian=self._truncate_gaussian,
+          max_radius=self._truncate_gaussian_max_radius)
       heatmaps.append(heatmap)
 
     # Return the stacked heatmaps over the batch.
@@ -1229,45 +1317,37 @@ class CenterNetBoxTargetAssigner(object):
     if gt_weights_list is None:
       gt_weights_list = [None] * len(gt_boxes_list)
 
-    batch_indices = []
-    batch_box_height_width = []
-    batch_weights = []
-    batch_offsets = []
-
+    batch_index_list = []
+    batch_weights_list = []
     for i, (boxes, weights) in enumerate(zip(gt_boxes_list, gt_weights_list)):
-      boxes = box_list.BoxList(boxes)
-      boxes = box_list_ops.to_absolute_coordinates(
-          boxes,
-          tf.maximum(height // self._stride, 1),
-          tf.maximum(width // self._stride, 1))
-      # Get the box center coordinates. Each returned tensors have the shape of
-      # [num_boxes]
-      (y_center, x_center, boxes_height,
-       boxes_width) = boxes.get_center_coordinates_and_sizes()
-      num_boxes = tf.shape(x_center)
-
-      # Compute the offsets and indices of the box centers. Shape:
-      #   offsets: [num_boxes, 2]
-      #   indices: [num_boxes, 2]
-      (offsets, indices) = ta_utils.compute_floor_offsets_with_indices(
-          y_source=y_center, x_source=x_center)
-
+      num_boxes, _ = shape_utils.combined_static_and_dynamic_shape(boxes)
+      # Shape of [num_boxes, 1] integer tensor filled with current batch index.
+      batch_index_list.append(tf.fill([num_boxes, 1], i))
       # Assign ones if weights are not provided.
       if weights is None:
-        weights = tf.ones(num_boxes, dtype=tf.float32)
-
-      # Shape of [num_boxes, 1] integer tensor filled with current batch index.
-      batch_index = i * tf.ones_like(indices[:, 0:1], dtype=tf.int32)
-      batch_indices.append(tf.concat([batch_index, indices], axis=1))
-      batch_box_height_width.append(
-          tf.stack([boxes_height, boxes_width], axis=1))
-      batch_weights.append(weights)
-      batch_offsets.append(offsets)
-
-    batch_indices = tf.concat(batch_indices, axis=0)
-    batch_box_height_width = tf.concat(batch_box_height_width, axis=0)
-    batch_weights = tf.concat(batch_weights, axis=0)
-    batch_offsets = tf.concat(batch_offsets, axis=0)
+        weights = tf.ones([num_boxes], dtype=tf.float32)
+      batch_weights_list.append(weights)
+
+    # The targets of all the images are computed in a single pass over the
+    # boxes of the whole batch.
+    boxes = box_list.BoxList(tf.concat(gt_boxes_list, axis=0))
+    out_height, out_width = _get_output_size(height, width, self._stride)
+    boxes = box_list_ops.to_absolute_coordinates(boxes, out_height, out_width)
+    # Get the box center coordinates. Each returned tensors have the shape of
+    # [num_boxes]
+    (y_center, x_center, boxes_height,
+     boxes_width) = boxes.get_center_coordinates_and_sizes()
+
+    # Compute the offsets and indices of the box centers. Shape:
+    #   offsets: [num_boxes, 2]
+    #   indices: [num_boxes, 2]
+    (batch_offsets, indices) = ta_utils.compute_floor_offsets_with_indices(
+        y_source=y_center, x_source=x_center)
+
+    batch_indices = tf.concat(
+        [tf.concat(batch_index_list, axis=0), indices], axis=1)
+    batch_box_height_width = tf.stack([boxes_height, boxes_width], axis=1)
+    batch_weights = tf.concat(batch_weights_list, axis=0)
     return (batch_indices, batch_box_height_width, batch_offsets, batch_weights)
 
 
@@ -1419,8 +1499,7 @@ class CenterNetKeypointTargetAssigner(object):
         are per keypoint type and are blacked out if the keypoint
         visibility/weight (of the corresponding keypoint type) is zero.
     """
-    out_width = tf.cast(tf.maximum(width // self._stride, 1), tf.float32)
-    out_height = tf.cast(tf.maximum(height // self._stride, 1), tf.float32)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     # Compute the yx-grid to be used to generate the heatmap. Each returned
     # tensor has shape of [out_height, out_width]
     y_grid, x_grid = ta_utils.image_shape_to_grids(out_height, out_width)
@@ -1432,6 +1511,10 @@ class CenterNetKeypointTargetAssigner(object):
     if gt_boxes_list is None:
       gt_boxes_list = [None] * len(gt_keypoints_list)
 
+    # The standard deviations of the Gaussian kernels of each keypoint type are
+    # shared by all the images in the batch.
+    keypoint_std_dev_per_type = tf.constant(self._keypoint_std_dev)
+
     heatmaps = []
     num_instances_list = []
     valid_mask_list = []
@@ -1464,9 +1547,9 @@ class CenterNetKeypointTargetAssigner(object):
       # A tensor of shape [num_instances, num_keypoints] with
       # each element representing the sigma of the Gaussian kernel for each
       # keypoint.
-      keypoint_std_dev = tf.tile(
-          input=tf.expand_dims(tf.constant(self._keypoint_std_dev), axis=0),
-          multiples=[num_instances, 1])
+      keypoint_std_dev = tf.broadcast_to(
+          keypoint_std_dev_per_type[tf.newaxis, :],
+          [num_instances, num_keypoints])
 
       # If boxes is not None, then scale the standard deviation based on the
       # size of the object bounding boxes similar to object center heatmap.
@@ -1474,9 +1557,7 @@ class CenterNetKeypointTargetAssigner(object):
         boxes = box_list.BoxList(boxes)
         # Convert the box coordinates to absolute output image dimension space.
         boxes = box_list_ops.to_absolute_coordinates(
-            boxes,
-            tf.maximum(height // self._stride, 1),
-            tf.maximum(width // self._stride, 1))
+            boxes, out_height, out_width)
         # Get the box height and width. Each returned tensors have the shape
         # of [num_instances]
         (_, _, boxes_height,
@@ -1484,8 +1565,7 @@ class CenterNetKeypointTargetAssigner(object):
 
         # Compute the sigma from box size. The tensor shape: [num_instances].
         sigma = _compute_std_dev_from_box_size(boxes_height, boxes_width, 0.7)
-        keypoint_std_dev = keypoint_std_dev * tf.stack(
-            [sigma] * num_keypoints, axis=1)
+        keypoint_std_dev = keypoint_std_dev * sigma[:, tf.newaxis]
 
         # Generate the per-keypoint type valid region mask to ignore regions
         # with keypoint weights equal to zeros (e.g. visibility is 0).
@@ -1596,12 +1676,13 @@ class CenterNetKeypointTargetAssigner(object):
       gt_keypoints_weights_list = [None] * len(gt_keypoints_list)
     if gt_weights_list is None:
       gt_weights_list = [None] * len(gt_classes_list)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (keypoints, classes, kp_weights, weights) in enumerate(
         zip(gt_keypoints_list, gt_classes_list, gt_keypoints_weights_list,
             gt_weights_list)):
       keypoints_absolute, kp_weights = _preprocess_keypoints_and_weights(
-          out_height=tf.maximum(height // self._stride, 1),
-          out_width=tf.maximum(width // self._stride, 1),
+          out_height=out_height,
+          out_width=out_width,
           keypoints=keypoints,
           class_onehot=classes,
           class_weights=weights,
@@ -1619,8 +1700,8 @@ class CenterNetKeypointTargetAssigner(object):
       # [num_instance * num_keypoints, num_neighbors]
       (y_source_neighbors, x_source_neighbors,
        valid_sources) = ta_utils.get_surrounding_grids(
-           tf.cast(tf.maximum(height // self._stride, 1), tf.float32),
-           tf.cast(tf.maximum(width // self._stride, 1), tf.float32),
+           out_height,
+           out_width,
            y_source, x_source,
            self._peak_radius)
       _, num_neighbors = shape_utils.combined_static_and_dynamic_shape(
@@ -1629,8 +1710,8 @@ class CenterNetKeypointTargetAssigner(object):
       # Update the valid keypoint weights.
       # [num_instance * num_keypoints, num_neighbors]
       valid_keypoints = tf.cast(
-          valid_sources, dtype=tf.float32) * tf.stack(
-              [tf.keras.backend.flatten(kp_weights)] * num_neighbors, axis=-1)
+          valid_sources, dtype=tf.float32) * tf.keras.backend.flatten(
+              kp_weights)[:, tf.newaxis]
 
       # Compute the offsets and indices of the box centers. Shape:
       #   offsets: [num_instances * num_keypoints, num_neighbors, 2]
@@ -1731,14 +1812,15 @@ class CenterNetKeypointTargetAssigner(object):
       gt_weights_list = [None] * len(gt_classes_list)
     if gt_keypoint_depths_list is None:
       gt_keypoint_depths_list = [None] * len(gt_classes_list)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (keypoints, classes, kp_weights, weights,
             keypoint_depths, keypoint_depth_weights) in enumerate(
                 zip(gt_keypoints_list, gt_classes_list,
                     gt_keypoints_weights_list, gt_weights_list,
                     gt_keypoint_depths_list, gt_keypoint_depth_weights_list)):
       keypoints_absolute, kp_weights = _preprocess_keypoints_and_weights(
-          out_height=tf.maximum(height // self._stride, 1),
-          out_width=tf.maximum(width // self._stride, 1),
+          out_height=out_height,
+          out_width=out_width,
           keypoints=keypoints,
           class_onehot=classes,
           class_weights=weights,
@@ -1756,8 +1838,8 @@ class CenterNetKeypointTargetAssigner(object):
       # [num_instance * num_keypoints, num_neighbors]
       (y_source_neighbors, x_source_neighbors,
        valid_sources) = ta_utils.get_surrounding_grids(
-           tf.cast(tf.maximum(height // self._stride, 1), tf.float32),
-           tf.cast(tf.maximum(width // self._stride, 1), tf.float32),
+           out_height,
+           out_width,
            y_source, x_source,
            self._peak_radius)
       _, num_neighbors = shape_utils.combined_static_and_dynamic_shape(
@@ -1766,8 +1848,8 @@ class CenterNetKeypointTargetAssigner(object):
       # Update the valid keypoint weights.
       # [num_instance * num_keypoints, num_neighbors]
       valid_keypoints = tf.cast(
-          valid_sources, dtype=tf.float32) * tf.stack(
-              [tf.keras.backend.flatten(kp_weights)] * num_neighbors, axis=-1)
+          valid_sources, dtype=tf.float32) * tf.keras.backend.flatten(
+              kp_weights)[:, tf.newaxis]
 
       # Compute the offsets and indices of the box centers. Shape:
       #   indices: [num_instances * num_keypoints, num_neighbors, 2]
@@ -1906,12 +1988,13 @@ class CenterNetKeypointTargetAssigner(object):
       gt_boxes_list = [None] * batch_size
     if gt_weights_list is None:
       gt_weights_list = [None] * len(gt_classes_list)
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (keypoints, classes, boxes, kp_weights, weights) in enumerate(
         zip(gt_keypoints_list, gt_classes_list,
             gt_boxes_list, gt_keypoints_weights_list, gt_weights_list)):
       keypoints_absolute, kp_weights = _preprocess_keypoints_and_weights(
-          out_height=tf.maximum(height // self._stride, 1),
-          out_width=tf.maximum(width // self._stride, 1),
+          out_height=out_height,
+          out_width=out_width,
           keypoints=keypoints,
           class_onehot=classes,
           class_weights=weights,
@@ -1926,9 +2009,7 @@ class CenterNetKeypointTargetAssigner(object):
         # Compute joint center from boxes.
         boxes = box_list.BoxList(boxes)
         boxes = box_list_ops.to_absolute_coordinates(
-            boxes,
-            tf.maximum(height // self._stride, 1),
-            tf.maximum(width // self._stride, 1))
+            boxes, out_height, out_width)
         y_center, x_center, _, _ = boxes.get_center_coordinates_and_sizes()
       else:
         # TODO(yuhuic): Add the logic to generate object centers from keypoints.
@@ -1947,16 +2028,16 @@ class CenterNetKeypointTargetAssigner(object):
       # [num_instance * num_keypoints, num_neighbors]
       (y_source_neighbors, x_source_neighbors,
        valid_sources) = ta_utils.get_surrounding_grids(
-           tf.cast(tf.maximum(height // self._stride, 1), tf.float32),
-           tf.cast(tf.maximum(width // self._stride, 1), tf.float32),
+           out_height,
+           out_width,
            tf.keras.backend.flatten(y_center_tiled),
            tf.keras.backend.flatten(x_center_tiled), self._peak_radius)
 
       _, num_neighbors = shape_utils.combined_static_and_dynamic_shape(
           y_source_neighbors)
       valid_keypoints = tf.cast(
-          valid_sources, dtype=tf.float32) * tf.stack(
-              [tf.keras.backend.flatten(kp_weights)] * num_neighbors, axis=-1)
+          valid_sources, dtype=tf.float32) * tf.keras.backend.flatten(
+              kp_weights)[:, tf.newaxis]
 
       # Compute the offsets and indices of the box centers. Shape:
       #   offsets: [num_instances * num_keypoints, 2]
@@ -2063,8 +2144,8 @@ class CenterNetMaskTargetAssigner(object):
 
     _, input_height, input_width = (
         shape_utils.combined_static_and_dynamic_shape(gt_masks_list[0]))
-    output_height = tf.maximum(input_height // self._stride, 1)
-    output_width = tf.maximum(input_width // self._stride, 1)
+    output_height, output_width = _get_output_size(
+        input_height, input_width, self._stride)
 
     if gt_boxes_list is None:
       gt_boxes_list = [None] * len(gt_masks_list)
@@ -2173,6 +2254,7 @@ class CenterNetDensePoseTargetAssigner(object):
     batch_surface_coords = []
     batch_weights = []
 
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (num_points, part_ids, surface_coords, weights) in enumerate(
         zip(gt_dp_num_points_list, gt_dp_part_ids_list,
             gt_dp_surface_coords_list, gt_weights_list)):
@@ -2182,9 +2264,7 @@ class CenterNetDensePoseTargetAssigner(object):
       part_ids_one_hot = tf.one_hot(part_ids_flattened, depth=self._num_parts)
       # Get DensePose coordinates in the output space.
       surface_coords_abs = densepose_ops.to_absolute_coordinates(
-          surface_coords,
-          tf.maximum(height // self._stride, 1),
-          tf.maximum(width // self._stride, 1))
+          surface_coords, out_height, out_width)
       surface_coords_abs = tf.reshape(surface_coords_abs, [-1, 4])
       # Each tensor has shape [num_boxes * max_sampled_points].
       yabs, xabs, v, u = tf.unstack(surface_coords_abs, axis=-1)
@@ -2198,22 +2278,16 @@ class CenterNetDensePoseTargetAssigner(object):
       # Assign ones if weights are not provided.
       if weights is None:
         weights = tf.ones(num_boxes, dtype=tf.float32)
-      # Create per-point weights.
+      # Create per-point weights, masking out invalid (i.e. padded) DensePose
+      # points.
+      valid_points = tf.sequence_mask(
+          num_points, max_sampled_points, dtype=tf.float32)
       weights_per_point = tf.reshape(
-          tf.tile(weights[:, tf.newaxis], multiples=[1, max_sampled_points]),
-          shape=[-1])
-      # Mask out invalid (i.e. padded) DensePose points.
-      num_points_tiled = tf.tile(num_points[:, tf.newaxis],
-                                 multiples=[1, max_sampled_points])
-      range_tiled = tf.tile(tf.range(max_sampled_points)[tf.newaxis, :],
-                            multiples=[num_boxes, 1])
-      valid_points = tf.math.less(range_tiled, num_points_tiled)
-      valid_points = tf.cast(tf.reshape(valid_points, [-1]), dtype=tf.float32)
-      weights_per_point = weights_per_point * valid_points
+          weights[:, tf.newaxis] * valid_points, shape=[-1])
 
       # Shape of [num_boxes * max_sampled_points] integer tensor filled with
       # current batch index.
-      batch_index = i * tf.ones_like(indices_y, dtype=tf.int32)
+      batch_index = tf.fill(tf.shape(indices_y), i)
       batch_indices.append(
           tf.stack([batch_index, indices_y, indices_x, part_ids_flattened],
                    axis=1))
@@ -2281,12 +2355,10 @@ class CenterNetTrackTargetAssigner(object):
     batch_indices = []
     batch_weights = []
 
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (boxes, weights) in enumerate(zip(gt_boxes_list, gt_weights_list)):
       boxes = box_list.BoxList(boxes)
-      boxes = box_list_ops.to_absolute_coordinates(
-          boxes,
-          tf.maximum(height // self._stride, 1),
-          tf.maximum(width // self._stride, 1))
+      boxes = box_list_ops.to_absolute_coordinates(boxes, out_height, out_width)
       # Get the box center coordinates. Each returned tensors have the shape of
       # [num_boxes]
       (y_center, x_center, _, _) = boxes.get_center_coordinates_and_sizes()
@@ -2302,7 +2374,7 @@ class CenterNetTrackTargetAssigner(object):
         weights = tf.ones(num_boxes, dtype=tf.float32)
 
       # Shape of [num_boxes, 1] integer tensor filled with current batch index.
-      batch_index = i * tf.ones_like(indices[:, 0:1], dtype=tf.int32)
+      batch_index = tf.fill([tf.shape(indices)[0], 1], i)
       batch_indices.append(tf.concat([batch_index, indices], axis=1))
       batch_weights.append(weights)
 
@@ -2323,7 +2395,7 @@ def filter_mask_overlap_min_area(masks):
     # Make sure background is ignored in argmin.
     per_pixel_area = (masks * per_pixel_area +
                       (1 - masks) * per_pixel_area.dtype.max)
-    min_index = tf.cast(tf.argmin(per_pixel_area, axis=0), tf.int32)
+    min_index = tf.argmin(per_pixel_area, axis=0, output_type=tf.int32)
 
     filtered_masks = (
         tf.range(num_instances)[:, tf.newaxis, tf.newaxis]
@@ -2389,8 +2461,8 @@ class CenterNetCornerOffsetTargetAssigner(object):
     """
     _, input_height, input_width = (
         shape_utils.combined_static_and_dynamic_shape(gt_masks_list[0]))
-    output_height = tf.maximum(input_height // self._stride, 1)
-    output_width = tf.maximum(input_width // self._stride, 1)
+    output_height, output_width = _get_output_size(
+        input_height, input_width, self._stride)
     y_grid, x_grid = tf.meshgrid(
         tf.range(output_height), tf.range(output_width),
         indexing='ij')
@@ -2497,13 +2569,11 @@ class CenterNetTemporalOffsetTargetAssigner(object):
     batch_weights = []
     batch_temporal_offsets = []
 
+    out_height, out_width = _get_output_size(height, width, self._stride)
     for i, (boxes, offsets, match_flags, weights) in enumerate(zip(
         gt_boxes_list, gt_offsets_list, gt_match_list, gt_weights_list)):
       boxes = box_list.BoxList(boxes)
-      boxes = box_list_ops.to_absolute_coordinates(
-          boxes,
-          tf.maximum(height // self._stride, 1),
-          tf.maximum(width // self._stride, 1))
+      boxes = box_list_ops.to_absolute_coordinates(boxes, out_height, out_width)
       # Get the box center coordinates. Each returned tensors have the shape of
       # [num_boxes]
       (y_center, x_center, _, _) = boxes.get_center_coordinates_and_sizes()
@@ -2522,7 +2592,7 @@ class CenterNetTemporalOffsetTargetAssigner(object):
       weights *= match_flags
 
       # Shape of [num_boxes, 1] integer tensor filled with current batch index.
-      batch_index = i * tf.ones_like(indices[:, 0:1], dtype=tf.int32)
+      batch_index = tf.fill([tf.shape(indices)[0], 1], i)
       batch_indices.append(tf.concat([batch_index, indices], axis=1))
       batch_weights.append(weights)
       batch_temporal_offsets.append(offsets)
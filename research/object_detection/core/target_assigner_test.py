@@ -1442,6 +1442,50 @@ class CenterNetCenterHeatmapTargetAssignerTest(test_case.TestCase,
     self.assertAlmostEqual(0.0, targets[1, :, :, [0, 1, 3]].max())
     self.assertAlmostEqual(0.0, targets[2, :, :, :3].max())
 
+  @parameterized.parameters(
+      {'sparse': False, 'truncate_gaussian': False, 'vectorize': False},
+      {'sparse': False, 'truncate_gaussian': False, 'vectorize': True},
+      {'sparse': True, 'truncate_gaussian': False, 'vectorize': True},
+      {'sparse': False, 'truncate_gaussian': True, 'vectorize': False},
+      {'sparse': False, 'truncate_gaussian': True, 'vectorize': True},
+  )
+  def test_padded_batch(self, sparse, truncate_gaussian, vectorize):
+    """Test images whose groundtruth is padded to the same shape.
+
+    With vectorize_padded_batch, the dense and sparse heatmaps are computed
+    with tf.vectorized_map, while the truncated heatmap always falls back to
+    the per-image loop.
+    """
+    def graph_fn():
+      weights = [
+          tf.constant([0., 1.]),
+          tf.constant([1., 0.]),
+      ]
+      box_batch = [
+          tf.constant([self._box_center, self._box_lower_left]),
+          tf.constant([self._box_center_small, self._box_center]),
+      ]
+      classes = [
+          tf.one_hot([0, 1], depth=4),
+          tf.one_hot([2, 3], depth=4),
+      ]
+      assigner = targetassigner.CenterNetCenterHeatmapTargetAssigner(
+          4, compute_heatmap_sparse=sparse,
+          truncate_gaussian=truncate_gaussian,
+          vectorize_padded_batch=vectorize)
+      targets = assigner.assign_center_targets_from_boxes(80, 80, box_batch,
+                                                          classes,
+                                                          weights)
+      return targets
+    targets = self.execute(graph_fn, [])
+    self.assertEqual((2, 20, 20, 4), targets.shape)
+    self.assertEqual((15, 5), _array_argmax(targets[0, :, :, 1]))
+    self.assertAlmostEqual(1.0, targets[0, 15, 5, 1])
+    self.assertEqual((10, 10), _array_argmax(targets[1, :, :, 2]))
+    self.assertAlmostEqual(1.0, targets[1, 10, 10, 2])
+    self.assertAlmostEqual(0.0, targets[0, :, :, [0, 2, 3]].max())
+    self.assertAlmostEqual(0.0, targets[1, :, :, [0, 1, 3]].max())
+
   def test_low_overlap(self):
     def graph1_fn():
       box_batch = [tf.constant([self._box_center])]
@@ -1619,6 +1663,25 @@ class CenterNetBoxTargetAssignerTest(test_case.TestCase):
         yx_offset, [[0, 0], [0, 0], [0, 0], [0, 0], [0, 0], [0.25, 0.75]])
     np.testing.assert_array_equal(weights, [0, 1, 1, 1, 0, 0])
 
+  def test_assign_size_and_offset_targets_empty_image(self):
+    """Test the assign_size_and_offset_targets function with an empty image."""
+    def graph_fn():
+      box_batch = [
+          tf.constant([self._box_center]),
+          tf.zeros((0, 4), dtype=tf.float32),
+          tf.constant([self._box_odd_coordinates]),
+      ]
+
+      assigner = targetassigner.CenterNetBoxTargetAssigner(4)
+      indices, hw, yx_offset, weights = assigner.assign_size_and_offset_targets(
+          80, 80, box_batch)
+      return indices, hw, yx_offset, weights
+    indices, hw, yx_offset, weights = self.execute(graph_fn, [])
+    np.testing.assert_array_equal(indices, [[0, 10, 10], [2, 7, 11]])
+    np.testing.assert_array_equal(hw, [[20, 20], [8, 15]])
+    np.testing.assert_array_equal(yx_offset, [[0, 0], [0.25, 0.75]])
+    np.testing.assert_array_equal(weights, 1)
+
   def test_get_batch_predictions_from_indices(self):
     """Test the get_batch_predictions_from_indices function.
 
@@ -2636,6 +2636,8 @@ class CenterNetMetaArch(model.DetectionModel):
                temporal_offset_params=None,
                use_depthwise=False,
                compute_heatmap_sparse=False,
+               truncate_heatmap_gaussian=False,
+               truncate_heatmap_max_radius=None,
                non_max_suppression_fn=None,
                unit_height_conv=False):
     """Initializes a CenterNet model.
@@ -2680,6 +2682,17 @@ class CenterNetMetaArch(model.DetectionModel):
         the Op that computes the center heatmaps. The sparse version scales
         better with number of channels in the heatmap, but in some cases is
         known to cause an OOM error. See b/170989061.
+      truncate_heatmap_gaussian: bool, whether or not to compute the center
+        heatmaps from Gaussian kernels truncated at 3 standard deviations,
+        which only touch the pixels near each object center. Takes precedence
+        over compute_heatmap_sparse. Unless truncate_heatmap_max_radius is set,
+        the size of the local footprints depends on the groundtruth, so the
+        model can't be compiled with XLA (e.g. on TPU).
+      truncate_heatmap_max_radius: An optional int, the static upper bound (in
+        output pixels) of the truncation radius used with
+        truncate_heatmap_gaussian. It makes the footprint size static so that
+        the heatmap targets can be compiled with XLA. Kernels wider than that
+        are truncated at this radius.
       non_max_suppression_fn: Optional Non Max Suppression function to apply.
       unit_height_conv: If True, Conv2Ds in prediction heads have asymmetric
         kernels with height=1.
@@ -2708,6 +2721,8 @@ class CenterNetMetaArch(model.DetectionModel):
 
     self._use_depthwise = use_depthwise
     self._compute_heatmap_sparse = compute_heatmap_sparse
+    self._truncate_heatmap_gaussian = truncate_heatmap_gaussian
+    self._truncate_heatmap_max_radius = truncate_heatmap_max_radius
 
     # subclasses may not implement the unit_height_conv arg, so only provide it
     # as a kwarg if it is True.
@@ -2931,7 +2946,9 @@ class CenterNetMetaArch(model.DetectionModel):
     if not keypoint_weights_for_center:
       target_assigners[OBJECT_CENTER] = (
           cn_assigner.CenterNetCenterHeatmapTargetAssigner(
-              stride, min_box_overlap_iou, self._compute_heatmap_sparse))
+              stride, min_box_overlap_iou, self._compute_heatmap_sparse,
+              truncate_gaussian=self._truncate_heatmap_gaussian,
+              truncate_gaussian_max_radius=self._truncate_heatmap_max_radius))
       self._center_from_keypoints = False
     else:
       # Determining the object center location by keypoint location is only
@@ -2949,7 +2966,9 @@ class CenterNetMetaArch(model.DetectionModel):
               self._compute_heatmap_sparse,
               keypoint_class_id=kp_params.class_id,
               keypoint_indices=kp_params.keypoint_indices,
-              keypoint_weights_for_center=keypoint_weights_for_center))
+              keypoint_weights_for_center=keypoint_weights_for_center,
+              truncate_gaussian=self._truncate_heatmap_gaussian,
+              truncate_gaussian_max_radius=self._truncate_heatmap_max_radius))
       self._center_from_keypoints = True
     if self._od_params is not None:
       target_assigners[DETECTION_TASK] = (
@@ -1845,7 +1845,9 @@ def build_center_net_meta_arch(build_resnet=False,
                                peak_radius=0,
                                keypoint_only=False,
                                candidate_ranking_mode='min_distance',
-                               argmax_postprocessing=False):
+                               argmax_postprocessing=False,
+                               truncate_heatmap_gaussian=False,
+                               truncate_heatmap_max_radius=None):
   """Builds the CenterNet meta architecture."""
   if build_resnet:
     feature_extractor = (
@@ -1940,6 +1942,8 @@ def build_center_net_meta_arch(build_resnet=False,
         densepose_params=get_fake_densepose_params(),
         track_params=get_fake_track_params(),
         temporal_offset_params=get_fake_temporal_offset_params(),
+        truncate_heatmap_gaussian=truncate_heatmap_gaussian,
+        truncate_heatmap_max_radius=truncate_heatmap_max_radius,
         non_max_suppression_fn=non_max_suppression_fn)
 
 
@@ -2108,10 +2112,17 @@ class CenterNetMetaArchTest(test_case.TestCase, parameterized.TestCase):
     self.assertEqual(prediction_dict[cnma.TEMPORAL_OFFSET][0].shape,
                      (2, 32, 32, 2))
 
-  def test_loss(self):
+  @parameterized.parameters(
+      {'truncate_heatmap_gaussian': False, 'truncate_heatmap_max_radius': None},
+      {'truncate_heatmap_gaussian': True, 'truncate_heatmap_max_radius': None},
+      {'truncate_heatmap_gaussian': True, 'truncate_heatmap_max_radius': 4},
+  )
+  def test_loss(self, truncate_heatmap_gaussian, truncate_heatmap_max_radius):
     """Test the loss function."""
     groundtruth_dict = get_fake_groundtruth_dict(16, 32, 4)
-    model = build_center_net_meta_arch()
+    model = build_center_net_meta_arch(
+        truncate_heatmap_gaussian=truncate_heatmap_gaussian,
+        truncate_heatmap_max_radius=truncate_heatmap_max_radius)
     model.provide_groundtruth(
         groundtruth_boxes_list=groundtruth_dict[fields.BoxListFields.boxes],
         groundtruth_weights_list=groundtruth_dict[fields.BoxListFields.weights],
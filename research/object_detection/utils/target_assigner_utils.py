@@ -80,43 +80,116 @@ def _coordinates_to_heatmap_dense(y_grid, x_grid, y_coordinates, x_coordinates,
 
 def _coordinates_to_heatmap_sparse(y_grid, x_grid, y_coordinates, x_coordinates,
                                    sigma, channel_onehot, channel_weights=None):
-  """Sparse version of coordinates to heatmap using tf.scatter."""
-
-  if not hasattr(tf, 'tensor_scatter_nd_max'):
-    raise RuntimeError(
-        ('Please upgrade tensowflow to use `tensor_scatter_nd_max` or set '
-         'compute_heatmap_sparse=False'))
+  """Sparse version of coordinates to heatmap using a segment max."""
   _, num_channels = (
       shape_utils.combined_static_and_dynamic_shape(channel_onehot))
 
-  height, width = shape_utils.combined_static_and_dynamic_shape(y_grid)
-  x_grid = tf.expand_dims(x_grid, 2)
-  y_grid = tf.expand_dims(y_grid, 2)
-  # The raw center coordinates in the output space.
-  x_diff = x_grid - tf.math.floor(x_coordinates)
-  y_diff = y_grid - tf.math.floor(y_coordinates)
+  # The raw center coordinates in the output space. The Gaussian maps are
+  # computed directly with shape [num_instances, height, width].
+  x_diff = (x_grid[tf.newaxis, :, :] -
+            tf.math.floor(x_coordinates)[:, tf.newaxis, tf.newaxis])
+  y_diff = (y_grid[tf.newaxis, :, :] -
+            tf.math.floor(y_coordinates)[:, tf.newaxis, tf.newaxis])
   squared_distance = x_diff**2 + y_diff**2
 
+  sigma = sigma[:, tf.newaxis, tf.newaxis]
   gaussian_map = tf.exp(-squared_distance / (2 * sigma * sigma))
 
   if channel_weights is not None:
-    gaussian_map = gaussian_map * channel_weights[tf.newaxis, tf.newaxis, :]
+    gaussian_map = gaussian_map * channel_weights[:, tf.newaxis, tf.newaxis]
 
-  channel_indices = tf.argmax(channel_onehot, axis=1)
+  channel_indices = tf.argmax(channel_onehot, axis=1, output_type=tf.int32)
 
-  channel_indices = channel_indices[:, tf.newaxis]
-  heatmap_init = tf.zeros((num_channels, height, width))
+  # Merge the per-instance maps of each channel into a tensor of shape
+  # [num_channels, height, width].
+  heatmap = tf.math.unsorted_segment_max(
+      gaussian_map, channel_indices, num_channels)
 
-  gaussian_map = tf.transpose(gaussian_map, (2, 0, 1))
-  heatmap = tf.tensor_scatter_nd_max(
-      heatmap_init, channel_indices, gaussian_map)
-
-  # Maximum of an empty tensor is -inf, the following is to avoid that.
+  # Maximum of an empty segment is the lowest float, the following is to avoid
+  # that.
   heatmap = tf.maximum(heatmap, 0)
 
   return tf.stop_gradient(tf.transpose(heatmap, (1, 2, 0)))
 
 
+def _coordinates_to_heatmap_truncated(y_grid, x_grid, y_coordinates,
+                                      x_coordinates, sigma, channel_onehot,
+                                      channel_weights=None, max_radius=None):
+  """Truncated version of coordinates to heatmap using local footprints."""
+
+  if not hasattr(tf, 'tensor_scatter_nd_max'):
+    raise RuntimeError(
+        ('Please upgrade tensorflow to use `tensor_scatter_nd_max` or set '
+         'truncate_gaussian=False'))
+  _, num_channels = (
+      shape_utils.combined_static_and_dynamic_shape(channel_onehot))
+
+  height, width = shape_utils.combined_static_and_dynamic_shape(y_grid)
+  # Each Gaussian kernel is truncated at floor(3 * sigma) pixels from its
+  # center. The footprints of all instances are padded to the largest radius,
+  # or to the static max_radius if provided so that their size is known at
+  # graph construction time.
+  radius = tf.math.floor(3 * sigma)
+  if max_radius is None:
+    max_radius = tf.cast(
+        tf.reduce_max(tf.concat([radius, [0.0]], axis=0)), tf.int32)
+  else:
+    radius = tf.minimum(radius, float(max_radius))
+  offset_range = tf.range(-max_radius, max_radius + 1)
+  y_offsets, x_offsets = tf.meshgrid(offset_range, offset_range, indexing='ij')
+  # Footprint offsets: [1, footprint_size].
+  y_offsets = tf.reshape(y_offsets, [1, -1])
+  x_offsets = tf.reshape(x_offsets, [1, -1])
+
+  # Pixel indices of the footprints: [num_instances, footprint_size]. The
+  # centers are floored and cast once per instance, the footprints are then
+  # laid out with integer arithmetic only.
+  y_centers = tf.cast(tf.math.floor(y_coordinates), tf.int32)
+  x_centers = tf.cast(tf.math.floor(x_coordinates), tf.int32)
+  y_indices = y_centers[:, tf.newaxis] + y_offsets
+  x_indices = x_centers[:, tf.newaxis] + x_offsets
+
+  # The truncated Gaussian kernel is separable, so only a 1D kernel of shape
+  # [num_instances, 2 * max_radius + 1] is evaluated per instance and the
+  # footprint values are its outer product with itself.
+  float_offset_range = tf.cast(offset_range, tf.float32)[tf.newaxis, :]
+  sigma = sigma[:, tf.newaxis]
+  kernel_1d = tf.exp(-float_offset_range**2 / (2 * sigma * sigma))
+  # Zero out the padded part of the footprints.
+  kernel_1d = tf.where(
+      tf.abs(float_offset_range) <= radius[:, tf.newaxis], kernel_1d,
+      tf.zeros_like(kernel_1d))
+  num_instances, kernel_size = (
+      shape_utils.combined_static_and_dynamic_shape(kernel_1d))
+  gaussian_values = tf.reshape(
+      kernel_1d[:, :, tf.newaxis] * kernel_1d[:, tf.newaxis, :],
+      [num_instances, kernel_size * kernel_size])
+
+  if channel_weights is not None:
+    gaussian_values = gaussian_values * channel_weights[:, tf.newaxis]
+
+  # Mask out the pixels outside of the image.
+  valid = tf.logical_and(
+      tf.logical_and(y_indices >= 0, y_indices < height),
+      tf.logical_and(x_indices >= 0, x_indices < width))
+  gaussian_values = tf.where(valid, gaussian_values,
+                             tf.zeros_like(gaussian_values))
+  y_indices = tf.where(valid, y_indices, tf.zeros_like(y_indices))
+  x_indices = tf.where(valid, x_indices, tf.zeros_like(x_indices))
+
+  channel_indices = tf.argmax(channel_onehot, axis=1, output_type=tf.int32)
+  channel_indices = tf.broadcast_to(channel_indices[:, tf.newaxis],
+                                    tf.shape(y_indices))
+  indices = tf.stack([y_indices, x_indices, channel_indices], axis=-1)
+
+  heatmap_init = tf.zeros((height, width, num_channels))
+  heatmap = tf.tensor_scatter_nd_max(
+      heatmap_init, tf.reshape(indices, [-1, 3]),
+      tf.reshape(gaussian_values, [-1]))
+
+  return tf.stop_gradient(heatmap)
+
+
 def coordinates_to_heatmap(y_grid,
                            x_grid,
                            y_coordinates,
@@ -124,7 +197,9 @@ def coordinates_to_heatmap(y_grid,
                            sigma,
                            channel_onehot,
                            channel_weights=None,
-                           sparse=False):
+                           sparse=False,
+                           truncate_gaussian=False,
+                           max_radius=None):
   """Returns the heatmap targets from a set of point coordinates.
 
   This function maps a set of point coordinates to the output heatmap image
@@ -151,13 +226,30 @@ def coordinates_to_heatmap(y_grid,
     sparse: bool, indicating whether or not to use the sparse implementation
       of the function. The sparse version scales better with number of channels,
       but in some cases is known to cause OOM error. See (b/170989061).
+    truncate_gaussian: bool, indicating whether or not to truncate the Gaussian
+      kernel of each point at floor(3 * sigma) pixels from its center, as in the
+      original CenterNet implementation. Only the local footprint of each point
+      is then computed and scattered into the heatmap, which scales better with
+      the output resolution. Like the sparse version, it expects one-hot
+      channel labels. Takes precedence over `sparse` when set.
+    max_radius: An optional int, the static upper bound (in pixels) of the
+      truncation radius. Only used when truncate_gaussian is True. If provided,
+      the footprints of all points have the static size
+      (2 * max_radius + 1)^2 and kernels wider than that are truncated at
+      max_radius. This is required to compile the truncated heatmap with XLA
+      (e.g. on TPU). If None, the footprint size is derived from the largest
+      sigma, which is not a compile-time constant.
 
   Returns:
     heatmap: A tensor of size [height, width, num_channels] representing the
       heatmap. Output (height, width) match the dimensions of the input grids.
   """
 
-  if sparse:
+  if truncate_gaussian:
+    return _coordinates_to_heatmap_truncated(
+        y_grid, x_grid, y_coordinates, x_coordinates, sigma, channel_onehot,
+        channel_weights, max_radius=max_radius)
+  elif sparse:
     return _coordinates_to_heatmap_sparse(
         y_grid, x_grid, y_coordinates, x_coordinates, sigma, channel_onehot,
         channel_weights)
@@ -271,23 +363,19 @@ def get_valid_keypoint_mask_for_class(keypoint_coordinates,
         keypoint_indices (if provided). The shape of this tensor will always be
         the same as the output mask.
   """
-  num_keypoints = tf.shape(keypoint_coordinates)[1]
+  # Select the keypoint columns first so that the NaN handling and masking
+  # below only touch the keypoints that are actually returned.
+  if keypoint_indices is not None:
+    keypoint_coordinates = tf.gather(
+        keypoint_coordinates, indices=keypoint_indices, axis=1)
   class_mask = class_onehot[:, class_id]
-  reshaped_class_mask = tf.tile(
-      tf.expand_dims(class_mask, axis=-1), multiples=[1, num_keypoints])
   not_nan = tf.math.logical_not(tf.math.is_nan(keypoint_coordinates))
-  mask = reshaped_class_mask * tf.cast(not_nan[:, :, 0], dtype=tf.float32)
+  mask = class_mask[:, tf.newaxis] * tf.cast(not_nan[:, :, 0],
+                                             dtype=tf.float32)
   keypoints_nan_to_zeros = tf.where(not_nan, keypoint_coordinates,
                                     tf.zeros_like(keypoint_coordinates))
   if class_weights is not None:
-    reshaped_class_weight = tf.tile(
-        tf.expand_dims(class_weights, axis=-1), multiples=[1, num_keypoints])
-    mask = mask * reshaped_class_weight
-
-  if keypoint_indices is not None:
-    mask = tf.gather(mask, indices=keypoint_indices, axis=1)
-    keypoints_nan_to_zeros = tf.gather(
-        keypoints_nan_to_zeros, indices=keypoint_indices, axis=1)
+    mask = mask * class_weights[:, tf.newaxis]
   return mask, keypoints_nan_to_zeros
 
 
@@ -345,12 +433,6 @@ def blackout_pixel_weights_by_box_regions(height, width, boxes, blackout,
     regions of the blackout boxes are 0.0 and 1.0 (or weights if supplied)
     elsewhere.
   """
-  num_instances, _ = shape_utils.combined_static_and_dynamic_shape(boxes)
-  # If no annotation instance is provided, return all ones (instead of
-  # unexpected values) to avoid NaN loss value.
-  if num_instances == 0:
-    return tf.ones([height, width], dtype=tf.float32)
-
   (y_grid, x_grid) = image_shape_to_grids(height, width)
   y_grid = tf.expand_dims(y_grid, axis=0)
   x_grid = tf.expand_dims(x_grid, axis=0)
@@ -374,27 +456,24 @@ def blackout_pixel_weights_by_box_regions(height, width, boxes, blackout,
 
   # Compute a [height, width] tensor with the maximum weight in each box, and
   # 0.0 elsewhere.
-  weights_tiled = tf.tile(
-      weights[:, tf.newaxis, tf.newaxis], [1, height, width])
-  weights_3d = tf.where(in_boxes, weights_tiled,
-                        tf.zeros_like(weights_tiled))
+  weights_3d = tf.cast(in_boxes, tf.float32) * weights[:, tf.newaxis,
+                                                       tf.newaxis]
   weights_2d = tf.math.maximum(
       tf.math.reduce_max(weights_3d, axis=0), 0.0)
 
-  # Add 1.0 to all regions outside a box.
+  # Add 1.0 to all regions outside a box. This also covers the case without
+  # any annotation instance, for which all ones are returned (instead of
+  # unexpected values) to avoid NaN loss value.
   weights_2d = tf.where(
       tf.math.reduce_any(in_boxes, axis=0),
       weights_2d,
       tf.ones_like(weights_2d))
 
   # Now enforce that blackout regions all have zero weights.
-  keep_region = tf.cast(tf.math.logical_not(blackout), tf.float32)
-  keep_region_tiled = tf.tile(
-      keep_region[:, tf.newaxis, tf.newaxis], [1, height, width])
-  keep_region_3d = tf.where(in_boxes, keep_region_tiled,
-                            tf.ones_like(keep_region_tiled))
-  keep_region_2d = tf.math.reduce_min(keep_region_3d, axis=0)
-  return weights_2d * keep_region_2d
+  blackout_region = tf.math.reduce_any(
+      tf.math.logical_and(in_boxes, blackout[:, tf.newaxis, tf.newaxis]),
+      axis=0)
+  return weights_2d * tf.cast(tf.math.logical_not(blackout_region), tf.float32)
 
 
 def _get_yx_indices_offset_by_radius(radius):
@@ -425,8 +504,8 @@ def get_surrounding_grids(height, width, y_coordinates, x_coordinates, radius):
   False.
 
   Args:
-    height: int, the height of the output image.
-    width: int, the width of the output image.
+    height: int or a scalar tensor, the height of the output image.
+    width: int or a scalar tensor, the width of the output image.
     y_coordinates: A tensor with shape [num_points] representing the absolute
       y-coordinates (in the output image space) of the points.
     x_coordinates: A tensor with shape [num_points] representing the absolute
@@ -446,6 +525,8 @@ def get_surrounding_grids(height, width, y_coordinates, x_coordinates, radius):
       valid: A [num_points, num_neighbors] boolean tensor representing whether
         each returned index is in valid image region or not.
   """
+  height = tf.cast(height, tf.float32)
+  width = tf.cast(width, tf.float32)
   # Floored y, x: [num_points, 1].
   y_center = tf.expand_dims(tf.math.floor(y_coordinates), axis=-1)
   x_center = tf.expand_dims(tf.math.floor(x_coordinates), axis=-1)
@@ -39,8 +39,6 @@ class TargetUtilTest(parameterized.TestCase, test_case.TestCase):
 
   @parameterized.parameters((False,), (True,))
   def test_coordinates_to_heatmap(self, sparse):
-    if not hasattr(tf, 'tensor_scatter_nd_max'):
-      self.skipTest('Cannot test function due to old TF version.')
 
     def graph_fn():
       (y_grid, x_grid) = ta_utils.image_shape_to_grids(height=3, width=5)
@@ -61,6 +59,93 @@ class TargetUtilTest(parameterized.TestCase, test_case.TestCase):
     # Peak at (0, 4) for the second class.
     self.assertAlmostEqual(1.0, heatmap[0, 4, 1])
 
+  def test_coordinates_to_heatmap_sparse_matches_dense(self):
+
+    def graph_fn():
+      (y_grid, x_grid) = ta_utils.image_shape_to_grids(height=4, width=6)
+      y_coordinates = tf.constant([1.5, 2.2, 0.5], dtype=tf.float32)
+      x_coordinates = tf.constant([2.5, 3.9, 4.5], dtype=tf.float32)
+      sigma = tf.constant([0.8, 1.2, 0.5], dtype=tf.float32)
+      channel_onehot = tf.constant([[1, 0, 0], [1, 0, 0], [0, 0, 1]],
+                                   dtype=tf.float32)
+      channel_weights = tf.constant([1, 0.5, 1], dtype=tf.float32)
+      dense_heatmap = ta_utils.coordinates_to_heatmap(
+          y_grid, x_grid, y_coordinates, x_coordinates, sigma, channel_onehot,
+          channel_weights, sparse=False)
+      sparse_heatmap = ta_utils.coordinates_to_heatmap(
+          y_grid, x_grid, y_coordinates, x_coordinates, sigma, channel_onehot,
+          channel_weights, sparse=True)
+      return dense_heatmap, sparse_heatmap
+
+    dense_heatmap, sparse_heatmap = self.execute(graph_fn, [])
+    np.testing.assert_allclose(dense_heatmap, sparse_heatmap, rtol=1e-6)
+    # The channel without any instance should be all zeros.
+    np.testing.assert_array_equal(sparse_heatmap[:, :, 1], 0.0)
+
+  @parameterized.parameters(
+      {'max_radius': None},
+      # Truncates the widest kernel (floor(3 * 1.2) = 3) at 2 pixels.
+      {'max_radius': 2},
+      # Pads all the footprints beyond the widest kernel.
+      {'max_radius': 5},
+  )
+  def test_coordinates_to_heatmap_truncated(self, max_radius):
+    if not hasattr(tf, 'tensor_scatter_nd_max'):
+      self.skipTest('Cannot test function due to old TF version.')
+
+    y_coordinates = np.array([1.5, 4.2, 0.5], dtype=np.float32)
+    x_coordinates = np.array([2.5, 5.9, 6.5], dtype=np.float32)
+    sigma = np.array([0.5, 1.2, 0.9], dtype=np.float32)
+    channels = np.array([0, 0, 2])
+    channel_weights = np.array([1, 0.5, 1], dtype=np.float32)
+
+    def graph_fn():
+      (y_grid, x_grid) = ta_utils.image_shape_to_grids(height=6, width=8)
+      heatmap = ta_utils.coordinates_to_heatmap(
+          y_grid, x_grid, tf.constant(y_coordinates),
+          tf.constant(x_coordinates), tf.constant(sigma),
+          tf.one_hot(channels, depth=3), tf.constant(channel_weights),
+          truncate_gaussian=True, max_radius=max_radius)
+      return heatmap
+
+    heatmap = self.execute(graph_fn, [])
+
+    expected_heatmap = np.zeros((6, 8, 3), dtype=np.float32)
+    y_grid, x_grid = np.meshgrid(np.arange(6), np.arange(8), indexing='ij')
+    for y, x, s, c, w in zip(y_coordinates, x_coordinates, sigma, channels,
+                             channel_weights):
+      y_diff = y_grid - np.floor(y)
+      x_diff = x_grid - np.floor(x)
+      radius = np.floor(3 * s)
+      if max_radius is not None:
+        radius = min(radius, max_radius)
+      gaussian = w * np.exp(-(y_diff**2 + x_diff**2) / (2 * s * s))
+      gaussian[(np.abs(y_diff) > radius) | (np.abs(x_diff) > radius)] = 0.0
+      expected_heatmap[:, :, c] = np.maximum(expected_heatmap[:, :, c],
+                                             gaussian)
+    np.testing.assert_allclose(heatmap, expected_heatmap, rtol=1e-5)
+
+  def test_coordinates_to_heatmap_truncated_jit_compile(self):
+    if not self.is_tf2():
+      self.skipTest('jit_compile is only available in TF2.')
+    if not hasattr(tf, 'tensor_scatter_nd_max'):
+      self.skipTest('Cannot test function due to old TF version.')
+
+    # With a static max_radius, the footprint size does not depend on sigma,
+    # which is not a compile-time constant here.
+    @tf.function(jit_compile=True)
+    def heatmap_fn(y_coordinates, x_coordinates, sigma):
+      (y_grid, x_grid) = ta_utils.image_shape_to_grids(height=6, width=8)
+      return ta_utils.coordinates_to_heatmap(
+          y_grid, x_grid, y_coordinates, x_coordinates, sigma,
+          tf.one_hot([0, 1], depth=2), truncate_gaussian=True, max_radius=3)
+
+    heatmap = heatmap_fn(tf.constant([1.5, 4.2]), tf.constant([2.5, 5.9]),
+                         tf.constant([0.5, 1.2])).numpy()
+    self.assertEqual((6, 8, 2), heatmap.shape)
+    self.assertAlmostEqual(1.0, heatmap[1, 2, 0])
+    self.assertAlmostEqual(1.0, heatmap[4, 5, 1])
+
   def test_compute_floor_offsets_with_indices_onlysource(self):
 
     def graph_fn():
@@ -240,6 +325,24 @@ class TargetUtilTest(parameterized.TestCase, test_case.TestCase):
     # The output should be all 1s since there's no annotation provided.
     np.testing.assert_array_equal(output, np.ones([10, 20], dtype=np.float32))
 
+  def test_blackout_pixel_weights_by_box_regions_dynamic_zero_instance(self):
+    @tf.function(input_signature=[tf.TensorSpec([None, 4], tf.float32),
+                                  tf.TensorSpec([None], tf.bool)])
+    def blackout_pixel_weights_by_box_regions(boxes, blackout):
+      return ta_utils.blackout_pixel_weights_by_box_regions(
+          10, 20, boxes, blackout)
+
+    def graph_fn():
+      boxes = tf.zeros([0, 4], dtype=tf.float32)
+      blackout = tf.zeros([0], dtype=tf.bool)
+      output = blackout_pixel_weights_by_box_regions(boxes, blackout)
+      return output
+
+    output = self.execute(graph_fn, [])
+    # The number of instances is only known at runtime, the output should still
+    # be all 1s.
+    np.testing.assert_array_equal(output, np.ones([10, 20], dtype=np.float32))
+
   def test_get_surrounding_grids(self):
 
     def graph_fn():